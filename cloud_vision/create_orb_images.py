@@ -8,23 +8,31 @@ Example usage:
         --bucket_path=my_bucket/my_dir
 """
 import PIL.Image
-import hashlib
+import argparse
+import collections
+import concurrent.futures
+import cv2
+import functools
+import glob
+import itertools
 import logging
 from lxml import etree
+import numpy as np
 import os
 import csv
+import threading
+import xxhash
 
-import tensorflow as tf
 
-
-flags = tf.app.flags
-flags.DEFINE_string('data_dir', 'images',
-                    '(Relative) path to images directory')
-flags.DEFINE_string('annotations_dir', 'annotations',
-                    '(Relative) path to annotations directory')
-flags.DEFINE_string('output_path', '', 'Path to dump orbs into')
-flags.DEFINE_string('bucket_path', 'rpad-discord-vcm', 'GCS Path')
-FLAGS = flags.FLAGS
+parser = argparse.ArgumentParser(description='Extract orbs from annotated images, prep for gcs upload.')
+parser.add_argument('--data_dir', default='images',
+                    help='(Relative) path to images directory')
+parser.add_argument('--annotations_dir', default='annotations',
+                    help='(Relative) path to annotations directory')
+parser.add_argument('--output_path', default='', help='Path to dump orbs into')
+parser.add_argument('--bucket_path', default='rpad-discord-vcm', help='GCS Path')
+parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                    help='Number of processes used to process annotations')
 
 RANDOM_SEED = 4242
 VALIDATION_PCT = .1
@@ -33,193 +41,333 @@ MAX_IMG_DIM = 1024.0
 ORB_SIZE=64
 ORB_EXPANSION_PCT=.1
 
+# Favor encode speed over file size; default zlib level 6 dominates save time.
+PNG_COMPRESS_LEVEL = 1
+
+CSV_BUFFER_SIZE = 1 << 20
+CSV_BATCH_SIZE = 4096
+
+# Most annotations handed to a worker process per task.
+MAX_IMAGE_BATCH_SIZE = 16
+
+# Orb PNGs are encoded and written off the main thread, which moves on to
+# decoding the next image. Bound the queue so pending orbs can't pile up.
+ENCODE_THREADS = 4
+MAX_PENDING_ENCODES = 32
+
+# Output directory -> filenames already present, populated lazily per process.
+_known_files = {}
+
+# Directories this process has already created.
+_mkdir_cache = set()
+
+_encode_pool = None
+_encode_slots = threading.BoundedSemaphore(MAX_PENDING_ENCODES)
+_pending_writes = []
+
+Annotation = collections.namedtuple('Annotation', ['filename', 'width', 'height', 'orbs'])
+OrbAnnotation = collections.namedtuple('OrbAnnotation', ['name', 'xmin', 'ymin', 'xmax', 'ymax'])
+
+# Annotations carry no ids and their whitespace is just labelImg's indentation.
+XML_PARSER = etree.XMLParser(huge_tree=False, collect_ids=False, remove_blank_text=True)
+
+
+def known_files(dir_path):
+    """Returns the set of filenames in dir_path, scanning it only once."""
+    if dir_path not in _known_files:
+        try:
+            with os.scandir(dir_path) as it:
+                _known_files[dir_path] = {entry.name for entry in it}
+        except FileNotFoundError:
+            _known_files[dir_path] = set()
+    return _known_files[dir_path]
+
+
+def ensure_dir(dir_path):
+    """os.makedirs, but only hits the filesystem once per directory."""
+    if dir_path not in _mkdir_cache:
+        os.makedirs(dir_path, exist_ok=True)
+        _mkdir_cache.add(dir_path)
+
+
+def encode_and_write(orb_arr, output_path):
+    try:
+        # OpenCV expects BGR channel order when encoding.
+        _, png = cv2.imencode('.png', cv2.cvtColor(orb_arr, cv2.COLOR_RGB2BGR),
+                              [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESS_LEVEL])
+        with open(output_path, 'wb') as f:
+            f.write(png.tobytes())
+    finally:
+        _encode_slots.release()
 
-def extract_orb_annotations(data):
-    return [x for x in data['object'] if 'orb' in x['name']]
 
+def submit_write(orb_arr, output_path):
+    """Queues an orb to be encoded and written by the encode thread pool."""
+    global _encode_pool
+    if _encode_pool is None:
+        _encode_pool = concurrent.futures.ThreadPoolExecutor(max_workers=ENCODE_THREADS)
 
-def load_image(data, image_dir):
-    input_path = os.path.join(image_dir, data['filename'])
+    _encode_slots.acquire()
+    _pending_writes.append(_encode_pool.submit(encode_and_write, orb_arr, output_path))
 
-    if not 'object' in data:
-        raise ValueError('no objects found in {}'.format(input_path))
+
+def wait_for_writes():
+    """Blocks until all queued orbs are on disk, re-raising any write error."""
+    for future in _pending_writes:
+        future.result()
+    _pending_writes.clear()
+
+
+def load_image(data, image_dir, target_max_dim=None):
+    """Opens and decodes an annotated image.
+
+    If target_max_dim is set, oversized JPEGs are decoded at a reduced scale
+    that still covers target_max_dim in both dimensions.
+
+    Returns the image and its size in the file, before any reduced decode.
+    """
+    input_path = os.path.join(image_dir, data.filename)
 
     image = PIL.Image.open(input_path)
     if image.format not in ('JPEG', 'PNG'):
         raise ValueError('Image format not JPEG/PNG')
 
-    return image
+    source_size = image.size
+    if target_max_dim and image.format == 'JPEG' and max(image.size) > target_max_dim:
+        image.draft('RGB', (int(target_max_dim), int(target_max_dim)))
 
+    # Decode once up front; the image is shared by the orb and screen passes.
+    image.load()
+    return image, source_size
 
-def process_orbs(data, image_dir, output_dir):
-    """Extracts orb images from annotated files and saves them to disk."""
-    image = load_image(data, image_dir)
 
-    image_width, image_height = image.size
-    orb_annotations = extract_orb_annotations(data)
-    for obj in orb_annotations:
-        class_text = obj['name']
+def orb_bboxes(data):
+    """Returns the orb boxes as an (N, 4) array of xmin, ymin, xmax, ymax."""
+    return np.array([(o.xmin, o.ymin, o.xmax, o.ymax) for o in data.orbs],
+                    dtype=np.float64).reshape(-1, 4)
 
-        bb = obj['bndbox']
-        xmin = int(bb['xmin'])
-        xmax = int(bb['xmax'])
-        ymin = int(bb['ymin'])
-        ymax = int(bb['ymax'])
 
-        def save_orb(xmin, ymin, xmax, ymax):
-            orb_img = image.crop((xmin, ymin, xmax, ymax))
-            orb_img = orb_img.resize((ORB_SIZE, ORB_SIZE), PIL.Image.ANTIALIAS)
+def resize_orbs(image_arr, bboxes):
+    """Crops each bbox out of image_arr and scales it to ORB_SIZE x ORB_SIZE."""
+    return [cv2.resize(image_arr[ymin:ymax, xmin:xmax], (ORB_SIZE, ORB_SIZE),
+                       interpolation=cv2.INTER_AREA)
+            for xmin, ymin, xmax, ymax in bboxes]
 
-            output_color_path = os.path.join(output_dir, class_text)
-            os.makedirs(output_color_path, exist_ok=True)
 
-            key = hashlib.md5(orb_img.tobytes()).hexdigest()
-            output_orb_path = os.path.join(output_color_path, key + '.png')
+def process_orbs(image, data, output_dir, source_size=None):
+    """Extracts orb images from annotated files and saves them to disk.
 
-            orb_img.save(output_orb_path)
+    If the image was decoded smaller than source_size, the annotation boxes
+    are scaled down to match.
 
-        # Save the directly annotated orb values.
-        save_orb(xmin, ymin, xmax, ymax)
+    Returns a list of (label, filename) pairs, one per orb image.
+    """
+    image_width, image_height = image.size
+    # One array for the whole image; each orb is a slice of it.
+    image_arr = np.asarray(image.convert('RGB'))
+
+    bboxes = orb_bboxes(data)
+    if source_size is not None and source_size != image.size:
+        source_width, source_height = source_size
+        bboxes *= [image_width / source_width, image_height / source_height] * 2
+    # Annotations can spill past the image edge; keep every crop inside it.
+    bboxes = bboxes.clip(0, [image_width, image_height] * 2)
+
+    # Also save a slightly expanded orb to allow for some error.
+    offsets = ORB_EXPANSION_PCT * (bboxes[:, 2:] - bboxes[:, :2])
+    expanded = np.hstack([bboxes[:, :2] - offsets, bboxes[:, 2:] + offsets])
+    expanded = expanded.clip(0, [image_width, image_height] * 2)
+
+    # Annotated bounds were int()ed, while the fractional expanded bounds went
+    # straight to PIL's crop, which rounds them; keep both behaviours.
+    bboxes = bboxes.astype(np.int32).tolist()
+    expanded = np.rint(expanded).astype(np.int32).tolist()
 
-        # Save a slightly expanded orb to allow for some error
-        x_offset = ORB_EXPANSION_PCT * (xmax - xmin)
-        y_offset = ORB_EXPANSION_PCT * (ymax - ymin)
-        xmin = max(0, xmin - x_offset)
-        xmax = min(image_width, xmax + x_offset)
-        ymin = max(0, ymin - y_offset)
-        ymax = min(image_height, ymax + y_offset)
-        save_orb(xmin, ymin, xmax, ymax)
+    results = []
+    # (output path, bbox) for each orb not already on disk.
+    new_orbs = []
+    for obj, bbox, expanded_bbox in zip(data.orbs, bboxes, expanded):
+        output_color_path = os.path.join(output_dir, obj.name)
+        existing_orbs = known_files(output_color_path)
+        for xmin, ymin, xmax, ymax in (bbox, expanded_bbox):
+            if xmax <= xmin or ymax <= ymin:
+                continue
 
+            # Key off the source crop so duplicates are skipped before resizing.
+            orb_arr = image_arr[ymin:ymax, xmin:xmax]
+            orb_filename = xxhash.xxh3_128(orb_arr.tobytes()).hexdigest() + '.png'
+            results.append((obj.name, orb_filename))
 
-def process_images(data, image_dir, output_dir):
-    """Reformats input images and creates the annotation csv."""
-    image = load_image(data, image_dir)
-    orb_annotations = extract_orb_annotations(data)
+            if orb_filename in existing_orbs:
+                continue
+            existing_orbs.add(orb_filename)
+            new_orbs.append((os.path.join(output_color_path, orb_filename),
+                             (xmin, ymin, xmax, ymax)))
+
+    orb_arrs = resize_orbs(image_arr, [bbox for _, bbox in new_orbs])
+    for (output_orb_path, _), orb_arr in zip(new_orbs, orb_arrs):
+        ensure_dir(os.path.dirname(output_orb_path))
+        submit_write(orb_arr, output_orb_path)
 
-    orb_count = len(orb_annotations)
+    return results
+
+
+def process_images(image, data, output_dir):
+    """Reformats input images and creates the annotation csv."""
+    orb_count = len(data.orbs)
     if orb_count not in [4*5, 5*6, 6*7]:
-        print('unexpected orb count of', orb_count, 'for', data['filename'], 'skipping it')
+        print('unexpected orb count of', orb_count, 'for', data.filename, 'skipping it')
         return []
 
-    max_dim = float(max(image.size[0], image.size[1]))
-    if max_dim > MAX_IMG_DIM:
-        scale_factor = 1.0 - (max_dim - MAX_IMG_DIM) / max_dim
-        if image.size[0] > image.size[1]:
-            new_width = MAX_IMG_DIM
-            new_height = image.size[1] * scale_factor
-        else:
-            new_width = image.size[0] * scale_factor
-            new_height = MAX_IMG_DIM
+    # Created up front by do_processing.
+    img_output_path = os.path.join(output_dir, 'corrected_images')
 
-        image = image.resize((int(new_width), int(new_height)), PIL.Image.ANTIALIAS)
+    # Key off the source image so already converted screens are not redone.
+    img_filename = xxhash.xxh3_128(image.tobytes()).hexdigest() + '.png'
+    output_img_path = os.path.join(img_output_path, img_filename)
+    existing_imgs = known_files(img_output_path)
+    if img_filename not in existing_imgs:
+        existing_imgs.add(img_filename)
 
-    img_output_path = os.path.join(output_dir, 'corrected_images')
-    os.makedirs(img_output_path, exist_ok=True)
+        max_dim = float(max(image.size[0], image.size[1]))
+        if max_dim > MAX_IMG_DIM:
+            scale_factor = 1.0 - (max_dim - MAX_IMG_DIM) / max_dim
+            if image.size[0] > image.size[1]:
+                new_width = MAX_IMG_DIM
+                new_height = image.size[1] * scale_factor
+            else:
+                new_width = image.size[0] * scale_factor
+                new_height = MAX_IMG_DIM
+
+            image = image.resize((int(new_width), int(new_height)), PIL.Image.Resampling.LANCZOS)
 
-    key = hashlib.md5(image.tobytes()).hexdigest()
-    output_img_path = os.path.join(img_output_path, key + '.png')
-    image.save(output_img_path)
+        image.save(output_img_path, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
 
-    width = int(data['size']['width'])
-    height = int(data['size']['height'])
+    bboxes = orb_bboxes(data) / ([data.width, data.height] * 2)
 
     results = []
 
-    for obj in orb_annotations:
+    for xmin, ymin, xmax, ymax in bboxes.tolist():
         class_text = 'orb'
-
-        xmin = float(obj['bndbox']['xmin']) / width
-        ymin = float(obj['bndbox']['ymin']) / height
-        xmax = float(obj['bndbox']['xmax']) / width
-        ymax = float(obj['bndbox']['ymax']) / height
         results.append(('UNASSIGNED', output_img_path, class_text, xmin, ymin, xmax, ymax))
 
     return results
 
 
 
-# Hacked in from object_detection library
-def recursive_parse_xml_to_dict(xml):
-    """Recursively parses XML contents to python dict.
-    We assume that `object` tags are the only ones that can appear
-    multiple times at the same level of a tree.
-    Args:
-      xml: xml tree obtained by parsing XML file contents using lxml.etree
-    Returns:
-      Python dictionary holding XML contents.
-    """
-    if not len(xml):
-        return {xml.tag: xml.text}
-    result = {}
-    for child in xml:
-        child_result = recursive_parse_xml_to_dict(child)
-        if child.tag != 'object':
-            result[child.tag] = child_result[child.tag]
-        else:
-            if child.tag not in result:
-                result[child.tag] = []
-            result[child.tag].append(child_result[child.tag])
-    return {xml.tag: result}
-
-
-def load_annotations(annotation_file):
-    with tf.gfile.GFile(annotation_file, 'r') as fid:
-        xml_str = fid.read()
-        xml = etree.fromstring(xml_str)
-        return recursive_parse_xml_to_dict(xml)['annotation']
-
-
-def do_orb_processing(image_dir, orb_output_path, annotation_files, orb_bucket_path):
-    for idx, annotation_file in enumerate(annotation_files):
-        print(annotation_file)
-        if idx % 100 == 0:
-            logging.info('On image %d of %d', idx, len(annotation_files))
-
-        data = load_annotations(annotation_file)
-        process_orbs(data, image_dir, orb_output_path)
+def parse_annotation(annotation_file):
+    """Extracts the image filename, size, and orb boxes from a VOC xml file."""
+    with open(annotation_file, 'rb') as fid:
+        xml = etree.parse(fid, parser=XML_PARSER)
 
-    orb_output_csv = os.path.join(orb_output_path, 'orb_data.csv')
-    last_output_path = os.path.basename(orb_output_path)
-    with open(orb_output_csv, 'w', encoding='utf-8') as f:
-        csv_writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        for label in os.listdir(orb_output_path):
-            label_dir = os.path.join(orb_output_path, label)
-            if not os.path.isdir(label_dir):
-                continue
-            for orb_filename in os.listdir(label_dir):
-                final_label_dir = os.path.join(last_output_path, label)
-                gcs_file_path = 'gs://{}/{}/{}'.format(orb_bucket_path, final_label_dir, orb_filename)
-                csv_writer.writerow([gcs_file_path, label])
+    if xml.find('object') is None:
+        raise ValueError('no objects found in {}'.format(annotation_file))
 
-    print_gsutil_help(orb_output_path, orb_bucket_path, last_output_path, 'orb_data.csv')
+    orbs = []
+    for obj in xml.iterfind('object'):
+        name = obj.findtext('name')
+        if 'orb' not in name:
+            continue
+        orbs.append(OrbAnnotation(name, *(int(obj.findtext('bndbox/' + field))
+                                          for field in ('xmin', 'ymin', 'xmax', 'ymax'))))
 
+    return Annotation(filename=xml.findtext('filename'),
+                      width=int(xml.findtext('size/width')),
+                      height=int(xml.findtext('size/height')),
+                      orbs=orbs)
 
-def pr(num):
-    return round(num, 4)
 
-def do_screen_processing(image_dir, screen_output_path, annotation_files, screen_bucket_path):
-    os.makedirs(screen_output_path, exist_ok=True)
-    screen_output_csv = os.path.join(screen_output_path, 'screen_data.csv')
-    last_output_path = os.path.basename(screen_output_path)
-    with open(screen_output_csv, 'w', encoding='utf-8') as f:
-        csv_writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+def mp_loop(fn, items, workers=None, chunksize=16):
+    """Maps fn over items using a process pool, yielding results in order."""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fn, items, chunksize=chunksize)
+
 
-        for idx, annotation_file in enumerate(annotation_files):
+def process_one(annotation_file, image_dir, orb_output_path, screen_output_path):
+    """Runs both the orb and screen passes over a single annotated image."""
+    data = parse_annotation(annotation_file)
+    image, source_size = load_image(data, image_dir, target_max_dim=MAX_IMG_DIM)
+    orb_results = process_orbs(image, data, orb_output_path, source_size=source_size)
+    screen_results = process_images(image, data, screen_output_path)
+    return annotation_file, orb_results, screen_results
+
+
+def process_batch(annotation_files, **kwargs):
+    """Runs process_one over several files, returning once their orbs are written."""
+    results = [process_one(annotation_file, **kwargs) for annotation_file in annotation_files]
+    wait_for_writes()
+    return results
+
+
+def write_batch(csv_writer, rows, batch_size=CSV_BATCH_SIZE):
+    """Writes out the buffered rows once at least batch_size have accumulated."""
+    if len(rows) >= batch_size:
+        csv_writer.writerows(rows)
+        rows.clear()
+
+
+def do_processing(image_dir, annotation_files,
+                  orb_output_path, orb_bucket_path,
+                  screen_output_path, screen_bucket_path,
+                  workers=None):
+    os.makedirs(orb_output_path, exist_ok=True)
+    orb_output_csv = os.path.join(orb_output_path, 'orb_data.csv')
+    last_orb_output_path = os.path.basename(orb_output_path)
+
+    os.makedirs(os.path.join(screen_output_path, 'corrected_images'), exist_ok=True)
+    screen_output_csv = os.path.join(screen_output_path, 'screen_data.csv')
+    last_screen_output_path = os.path.basename(screen_output_path)
+
+    worker = functools.partial(process_batch,
+                               image_dir=image_dir,
+                               orb_output_path=orb_output_path,
+                               screen_output_path=screen_output_path)
+    # Smaller batches on small runs, so that every worker has a few tasks.
+    batch_size = max(1, min(MAX_IMAGE_BATCH_SIZE,
+                            len(annotation_files) // (4 * (workers or os.cpu_count()))))
+    batches = [annotation_files[i:i + batch_size]
+               for i in range(0, len(annotation_files), batch_size)]
+    with open(orb_output_csv, 'w', encoding='utf-8', buffering=CSV_BUFFER_SIZE, newline='') as orb_f, \
+            open(screen_output_csv, 'w', encoding='utf-8', buffering=CSV_BUFFER_SIZE, newline='') as screen_f:
+        orb_csv_writer = csv.writer(orb_f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        screen_csv_writer = csv.writer(screen_f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+        orb_rows = []
+        screen_rows = []
+
+        # The same orb can come out of several images; only list it once.
+        seen_orbs = set()
+
+        # Rows are only written from this process, so the csvs need no locking.
+        for idx, (annotation_file, orb_results, screen_results) in enumerate(
+                itertools.chain.from_iterable(mp_loop(worker, batches, workers, chunksize=1))):
             print(annotation_file)
             if idx % 100 == 0:
                 logging.info('On image %d of %d', idx, len(annotation_files))
 
-            data = load_annotations(annotation_file)
-            results = process_images(data, image_dir, screen_output_path)
+            for label, orb_filename in orb_results:
+                if (label, orb_filename) in seen_orbs:
+                    continue
+                seen_orbs.add((label, orb_filename))
+                final_label_dir = os.path.join(last_orb_output_path, label)
+                gcs_file_path = 'gs://{}/{}/{}'.format(orb_bucket_path, final_label_dir, orb_filename)
+                orb_rows.append([gcs_file_path, label])
 
-            for item in results:
+            for item in screen_results:
                 item_path = item[1].replace(screen_output_path + '/', '')
-                gcs_file_path = 'gs://{}/{}/{}'.format(screen_bucket_path, last_output_path, item_path)
-                csv_writer.writerow([item[0], gcs_file_path, item[2],
-                                     pr(item[3]), pr(item[4]), '', '',
-                                     pr(item[5]), pr(item[6]), '', ''])
+                gcs_file_path = 'gs://{}/{}/{}'.format(screen_bucket_path, last_screen_output_path, item_path)
+                screen_rows.append((item[0], gcs_file_path, item[2],
+                                    f'{item[3]:.4f}', f'{item[4]:.4f}', '', '',
+                                    f'{item[5]:.4f}', f'{item[6]:.4f}', '', ''))
 
-    print_gsutil_help(screen_output_path, screen_bucket_path, last_output_path, 'screen_data.csv')
+            write_batch(orb_csv_writer, orb_rows)
+            write_batch(screen_csv_writer, screen_rows)
+
+        write_batch(orb_csv_writer, orb_rows, batch_size=0)
+        write_batch(screen_csv_writer, screen_rows, batch_size=0)
+
+    print_gsutil_help(orb_output_path, orb_bucket_path, last_orb_output_path, 'orb_data.csv')
+    print_gsutil_help(screen_output_path, screen_bucket_path, last_screen_output_path, 'screen_data.csv')
 
 
 def print_gsutil_help(local_path, bucket_path, bucket_folder, csv_file_name):
@@ -233,21 +381,21 @@ def print_gsutil_help(local_path, bucket_path, bucket_folder, csv_file_name):
     print('  gs://{}/{}/{}'.format(bucket_path, bucket_folder, csv_file_name))
 
 
-def main(_):
-    image_dir = FLAGS.data_dir
-    annotation_files = tf.gfile.Glob(os.path.join(FLAGS.annotations_dir, '*.xml'))
+def main(args):
+    image_dir = args.data_dir
+    annotation_files = glob.glob(os.path.join(args.annotations_dir, '*.xml'))
     logging.info('Processing %s images.', len(annotation_files))
 
-    orb_output_path = os.path.join(FLAGS.output_path, 'extracted_orb_images')
-    orb_bucket_path = os.path.join(FLAGS.bucket_path, 'orbs')
-    print('starting orb processing')
-    do_orb_processing(image_dir, orb_output_path, annotation_files, orb_bucket_path)
-
-    print('starting screen processing')
-    screen_output_path = os.path.join(FLAGS.output_path, 'orbs_in_screens')
-    screen_bucket_path = os.path.join(FLAGS.bucket_path, 'orbs')
-    do_screen_processing(image_dir, screen_output_path, annotation_files, screen_bucket_path)
+    orb_output_path = os.path.join(args.output_path, 'extracted_orb_images')
+    orb_bucket_path = os.path.join(args.bucket_path, 'orbs')
+    screen_output_path = os.path.join(args.output_path, 'orbs_in_screens')
+    screen_bucket_path = os.path.join(args.bucket_path, 'orbs')
+    print('starting orb and screen processing')
+    do_processing(image_dir, annotation_files,
+                  orb_output_path, orb_bucket_path,
+                  screen_output_path, screen_bucket_path,
+                  workers=args.workers)
 
 
 if __name__ == '__main__':
-    tf.app.run()
+    main(parser.parse_args())